@@ -1,21 +1,122 @@
 #!/usr/bin/env python2
 # -*- coding: utf-8-*-
 import os
-import wave
 import json
+import struct
 import tempfile
+import io
 import logging
-import urllib
 from urllib import parse
 import re
 import subprocess
+import threading
+import asyncio
+import time
+import functools
+import contextlib
+from operator import itemgetter
 from abc import ABCMeta, abstractmethod
 import requests
+from requests.adapters import HTTPAdapter
 import yaml
+try:
+    # orjson is optional, it just decodes STT responses faster. Its
+    # JSONDecodeError subclasses json.JSONDecodeError.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 from client import jasperpath
 from client import diagnose
 from client import vocabcompiler
 
+_HTTP_UNAUTHORIZED = requests.codes['unauthorized']
+_HTTP_FORBIDDEN = requests.codes['forbidden']
+
+
+@functools.lru_cache(maxsize=1)
+def _load_profile():
+    """
+    Parses profile.yml once, using libyaml's CSafeLoader if available.
+
+    Returns:
+        The profile as dict, or an empty dict if there is no profile.yml
+    """
+    profile_path = jasperpath.config('profile.yml')
+    if not os.path.exists(profile_path):
+        return {}
+    with open(profile_path, 'r') as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader',
+                                           yaml.SafeLoader)) or {}
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """
+    Returns the keep-alive HTTP session shared by all network STT engines.
+    urllib3 pools connections per host, so this lets the passive and active
+    instances of an engine reuse each other's connections (and skip the DNS
+    lookup and TLS handshake).
+    """
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_maxsize=4))
+    return session
+
+
+def _parse_last_json_object(content):
+    """
+    Parses the last of several newline-separated JSON objects.
+
+    bytes.rfind() is a single backwards memrchr() scan over the raw buffer,
+    so neither a decoded copy nor a list of lines is built.
+
+    Arguments:
+        content -- the raw (undecoded) response body
+
+    Returns:
+        The decoded last JSON object
+    """
+    content = content.rstrip()
+    return _json_loads(content[content.rfind(b'\n') + 1:])
+
+
+@functools.lru_cache(maxsize=None)
+def _get_vocabulary(vocabulary_type, name, phrases):
+    """
+    Returns a vocabulary that is compiled for the given phrases. Each
+    vocabulary is only checked (and compiled if necessary) once per process.
+
+    Arguments:
+        vocabulary_type -- the AbstractVocabulary subclass to use
+        name -- the name of the vocabulary
+        phrases -- a tuple of phrases
+    """
+    vocabulary = vocabulary_type(name, path=jasperpath.config('vocabularies'))
+    if not vocabulary.matches_phrases(phrases):
+        vocabulary.compile(phrases)
+    return vocabulary
+
+
+def _upload_body(fp):
+    """
+    Returns the request body for the rest of the audio in fp.
+
+    Audio that is still in memory (a BytesIO, or a SpooledTemporaryFile that
+    hasn't been rolled over) is sent as a memoryview of its buffer. Passing
+    the file object itself would make requests call fileno() to determine
+    the Content-Length, which writes a SpooledTemporaryFile to disk. Files
+    on disk are streamed.
+
+    Arguments:
+        fp -- a file object containing audio data
+    """
+    buf = fp
+    if isinstance(fp, tempfile.SpooledTemporaryFile):
+        buf = fp._file
+    if isinstance(buf, io.BytesIO):
+        # getvalue() doesn't copy the buffer, and neither does the slice
+        return memoryview(buf.getvalue())[buf.tell():]
+    return fp
+
 
 class AbstractSTTEngine(object):
     """
@@ -23,7 +124,22 @@ class AbstractSTTEngine(object):
     """
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
     VOCABULARY_TYPE = None
+    _logger = logging.getLogger(__name__)
+    # Maps SLUG to engine class, filled in as subclasses are defined
+    _registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        slug = cls.__dict__.get('SLUG')
+        if slug:
+            if slug in AbstractSTTEngine._registry:
+                cls._logger.warning("Multiple STT engines found for slug " +
+                                    "'%s'. This is most certainly a bug.",
+                                    slug)
+            # The first engine defined for a slug wins
+            AbstractSTTEngine._registry.setdefault(slug, cls)
 
     @classmethod
     def get_config(cls):
@@ -33,12 +149,9 @@ class AbstractSTTEngine(object):
     def get_instance(cls, vocabulary_name, phrases):
         config = cls.get_config()
         if cls.VOCABULARY_TYPE:
-            vocabulary = cls.VOCABULARY_TYPE(vocabulary_name,
-                                             path=jasperpath.config(
-                                                 'vocabularies'))
-            if not vocabulary.matches_phrases(phrases):
-                vocabulary.compile(phrases)
-            config['vocabulary'] = vocabulary
+            config['vocabulary'] = _get_vocabulary(cls.VOCABULARY_TYPE,
+                                                   vocabulary_name,
+                                                   tuple(phrases))
         instance = cls(**config)
         return instance
 
@@ -65,8 +178,46 @@ class AbstractSTTEngine(object):
 
     @abstractmethod
     def transcribe(self, fp):
+        """
+        Transcribes an audio file.
+
+        Arguments:
+            fp -- a file object or the path of the .wav file to be transcribed
+        """
         pass
 
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_audio(fp):
+        """
+        Yields a file object for fp. Paths are opened here, so that the same
+        recording can be passed to several engines without reading it into
+        memory first.
+
+        Arguments:
+            fp -- a file object or the path of an audio file
+        """
+        if isinstance(fp, (str, os.PathLike)):
+            with open(fp, 'rb') as f:
+                yield f
+        else:
+            yield fp
+
+    async def transcribe_async(self, fp):
+        """
+        Runs transcribe() in the event loop's default executor, so that
+        several (network-bound) transcriptions can overlap.
+
+        Only the network engines may run several transcriptions on the same
+        instance concurrently. PocketSphinxSTT and JuliusSTT keep decoder
+        and subprocess state per instance.
+
+        Arguments:
+            fp -- a file object or the path of the .wav file to be transcribed
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.transcribe, fp)
+
 
 class GoogleSTT(AbstractSTTEngine):
     """
@@ -99,6 +250,12 @@ class GoogleSTT(AbstractSTTEngine):
     """
 
     SLUG = 'google'
+    __slots__ = ('_request_url', '_language', '_api_key', '_header_cache',
+                 '_http')
+    # Only the key and the language vary, everything else is constant
+    REQUEST_URL_TEMPLATE = ('https://www.google.com/speech-api/v2/recognize' +
+                            '?output=json&client=chromium&key=%s&lang=%s' +
+                            '&maxresults=6&pfilter=2')
 
     def __init__(self, api_key=None, language='en-us'):
         # FIXME: get init args from config
@@ -106,11 +263,11 @@ class GoogleSTT(AbstractSTTEngine):
         Arguments:
         api_key - the public api key which allows access to Google APIs
         """
-        self._logger = logging.getLogger(__name__)
         self._request_url = None
         self._language = None
         self._api_key = None
-        self._http = requests.Session()
+        self._header_cache = {}
+        self._http = _http_session()
         self.language = language
         self.api_key = api_key
 
@@ -138,15 +295,9 @@ class GoogleSTT(AbstractSTTEngine):
 
     def _regenerate_request_url(self):
         if self.api_key and self.language:
-            query = urllib.urlencode({'output': 'json',
-                                      'client': 'chromium',
-                                      'key': self.api_key,
-                                      'lang': self.language,
-                                      'maxresults': 6,
-                                      'pfilter': 2})
-            self._request_url = parse.urlunparse(
-                ('https', 'www.google.com', '/speech-api/v2/recognize', '',
-                 query, ''))
+            self._request_url = self.REQUEST_URL_TEMPLATE % (
+                parse.quote_plus(self.api_key),
+                parse.quote_plus(self.language))
         else:
             self._request_url = None
 
@@ -154,14 +305,10 @@ class GoogleSTT(AbstractSTTEngine):
     def get_config(cls):
         # FIXME: Replace this as soon as we have a config module
         config = {}
-        # HMM dir
-        # Try to get hmm_dir from config
-        profile_path = jasperpath.config('profile.yml')
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r') as f:
-                profile = yaml.safe_load(f)
-                if 'keys' in profile and 'GOOGLE_SPEECH' in profile['keys']:
-                    config['api_key'] = profile['keys']['GOOGLE_SPEECH']
+        # Try to get the API key from config
+        profile = _load_profile()
+        if 'keys' in profile and 'GOOGLE_SPEECH' in profile['keys']:
+            config['api_key'] = profile['keys']['GOOGLE_SPEECH']
         return config
 
     def transcribe(self, fp):
@@ -170,7 +317,7 @@ class GoogleSTT(AbstractSTTEngine):
         returning an English string.
 
         Arguments:
-        audio_file_path -- the path to the .wav file to be transcribed
+        fp -- a file object or the path of the .wav file to be transcribed
         """
 
         if not self.api_key:
@@ -182,33 +329,43 @@ class GoogleSTT(AbstractSTTEngine):
                                   'request aborted.')
             return []
 
-        wav = wave.open(fp, 'rb')
-        frame_rate = wav.getframerate()
-        wav.close()
-        data = fp.read()
+        with self._open_audio(fp) as f:
+            # Read the sample rate straight from the canonical 44 byte PCM
+            # WAV header (as written by Mic) and stream the sample data after
+            # it
+            f.seek(24)
+            frame_rate = struct.unpack('<I', f.read(4))[0]
+            f.seek(44)
 
-        headers = {'content-type': 'audio/l16; rate=%s' % frame_rate}
-        r = self._http.post(self.request_url, data=data, headers=headers)
+            try:
+                headers = self._header_cache[frame_rate]
+            except KeyError:
+                headers = {'content-type': 'audio/l16; rate=%s' % frame_rate}
+                self._header_cache[frame_rate] = headers
+            r = self._http.post(self.request_url, data=_upload_body(f),
+                                headers=headers)
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError:
             self._logger.critical('Request failed with http status %d',
                                   r.status_code)
-            if r.status_code == requests.codes['forbidden']:
+            if r.status_code == _HTTP_FORBIDDEN:
                 self._logger.warning('Status 403 is probably caused by an ' +
                                      'invalid Google API key.')
             return []
-        r.encoding = 'utf-8'
         try:
             # We cannot simply use r.json() because Google sends invalid json
             # (i.e. multiple json objects, seperated by newlines. We only want
             # the last one).
-            response = json.loads(list(r.text.strip().split('\n', 1))[-1])
+            response = _parse_last_json_object(r.content)
             if len(response['result']) == 0:
                 # Response result is empty
                 raise ValueError('Nothing has been transcribed.')
             results = [alt['transcript'] for alt
                        in response['result'][0]['alternative']]
+        except json.JSONDecodeError:
+            self._logger.warning('Cannot decode response.', exc_info=True)
+            results = []
         except ValueError as e:
             self._logger.warning('Empty response: %s', e.args[0])
             results = []
@@ -217,7 +374,7 @@ class GoogleSTT(AbstractSTTEngine):
             results = []
         else:
             # Convert all results to uppercase
-            results = tuple(result.upper() for result in results)
+            results = tuple(map(str.upper, results))
             self._logger.info('Transcribed: %r', results)
         return results
 
@@ -242,58 +399,86 @@ class AttSTT(AbstractSTTEngine):
     """
 
     SLUG = "att"
+    __slots__ = ('_token', '_token_expiry', '_token_lock', '_headers', '_http',
+                 'app_key', 'app_secret')
 
     def __init__(self, app_key, app_secret):
-        self._logger = logging.getLogger(__name__)
         self._token = None
+        self._token_expiry = 0
+        self._token_lock = threading.Lock()
+        self._headers = {'accept': 'application/json',
+                         'content-type': 'audio/wav'}
+        self._http = _http_session()
         self.app_key = app_key
         self.app_secret = app_secret
+        # Fetch the OAuth token in the background, so that the first
+        # transcription doesn't have to wait for it
+        threading.Thread(target=self._prefetch_token, daemon=True).start()
 
     @classmethod
     def get_config(cls):
         # FIXME: Replace this as soon as we have a config module
         config = {}
         # Try to get AT&T app_key/app_secret from config
-        profile_path = jasperpath.config('profile.yml')
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r') as f:
-                profile = yaml.safe_load(f)
-                if 'att-stt' in profile:
-                    if 'app_key' in profile['att-stt']:
-                        config['app_key'] = profile['att-stt']['app_key']
-                    if 'app_secret' in profile['att-stt']:
-                        config['app_secret'] = profile['att-stt']['app_secret']
+        profile = _load_profile()
+        if 'att-stt' in profile:
+            if 'app_key' in profile['att-stt']:
+                config['app_key'] = profile['att-stt']['app_key']
+            if 'app_secret' in profile['att-stt']:
+                config['app_secret'] = profile['att-stt']['app_secret']
         return config
 
     @property
     def token(self):
-        if not self._token:
-            headers = {'content-type': 'application/x-www-form-urlencoded',
-                       'accept': 'application/json'}
-            payload = {'client_id': self.app_key,
-                       'client_secret': self.app_secret,
-                       'scope': 'SPEECH',
-                       'grant_type': 'client_credentials'}
-            r = requests.post('https://api.att.com/oauth/v4/token',
-                              data=payload,
-                              headers=headers)
-            self._token = r.json()['access_token']
-        return self._token
+        with self._token_lock:
+            # Concurrent transcriptions share a single token request
+            if not self._token or time.monotonic() >= self._token_expiry:
+                headers = {'content-type':
+                           'application/x-www-form-urlencoded',
+                           'accept': 'application/json'}
+                payload = {'client_id': self.app_key,
+                           'client_secret': self.app_secret,
+                           'scope': 'SPEECH',
+                           'grant_type': 'client_credentials'}
+                # Time out, so that a hanging token request cannot block
+                # every transcription waiting on the lock forever
+                r = self._http.post('https://api.att.com/oauth/v4/token',
+                                    data=payload,
+                                    headers=headers,
+                                    timeout=10)
+                response = _json_loads(r.content)
+                self._token = response['access_token']
+                if 'expires_in' in response:
+                    # Refresh the token a minute before it actually expires
+                    self._token_expiry = (time.monotonic() +
+                                          int(response['expires_in']) - 60)
+                else:
+                    self._token_expiry = float('inf')
+            return self._token
+
+    def _prefetch_token(self):
+        try:
+            self.token
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            self._logger.warning('Prefetching OAuth access token failed.',
+                                 exc_info=True)
 
     def transcribe(self, fp):
-        data = fp.read()
-        r = self._get_response(data)
-        if r.status_code == requests.codes['unauthorized']:
-            # Request token invalid, retry once with a new token
-            self._logger.warning('OAuth access token invalid, generating a ' +
-                                 'new one and retrying...')
-            self._token = None
-            r = self._get_response(data)
+        with self._open_audio(fp) as f:
+            start = f.tell()
+            r = self._get_response(f)
+            if r.status_code == _HTTP_UNAUTHORIZED:
+                # Request token invalid, retry once with a new token
+                self._logger.warning('OAuth access token invalid, ' +
+                                     'generating a new one and retrying...')
+                self._token = None
+                f.seek(start)
+                r = self._get_response(f)
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError:
             self._logger.critical('Request failed with response: %r',
-                                  r.text,
+                                  r.content,
                                   exc_info=True)
             return []
         except requests.exceptions.RequestException:
@@ -301,11 +486,15 @@ class AttSTT(AbstractSTTEngine):
             return []
         else:
             try:
-                recognition = r.json()['Recognition']
+                recognition = _json_loads(r.content)['Recognition']
                 if recognition['Status'] != 'OK':
                     raise ValueError(recognition['Status'])
                 results = [(x['Hypothesis'], x['Confidence'])
                            for x in recognition['NBest']]
+            except json.JSONDecodeError:
+                self._logger.critical('Cannot decode response.',
+                                      exc_info=True)
+                return []
             except ValueError as e:
                 self._logger.debug('Recognition failed with status: %s',
                                    e.args[0])
@@ -315,19 +504,17 @@ class AttSTT(AbstractSTTEngine):
                                       exc_info=True)
                 return []
             else:
-                transcribed = [x[0].upper() for x in sorted(results,
-                                                            key=lambda x: x[1],
-                                                            reverse=True)]
+                results.sort(key=itemgetter(1), reverse=True)
+                transcribed = [x[0].upper() for x in results]
                 self._logger.info('Transcribed: %r', transcribed)
                 return transcribed
 
-    def _get_response(self, data):
-        headers = {'authorization': 'Bearer %s' % self.token,
-                   'accept': 'application/json',
-                   'content-type': 'audio/wav'}
-        return requests.post('https://api.att.com/speech/v3/speechToText',
-                             data=data,
-                             headers=headers)
+    def _get_response(self, fp):
+        headers = dict(self._headers,
+                       authorization='Bearer %s' % self.token)
+        return self._http.post('https://api.att.com/speech/v3/speechToText',
+                               data=_upload_body(fp),
+                               headers=headers)
 
     @classmethod
     def is_available(cls):
@@ -349,9 +536,10 @@ class WitAiSTT(AbstractSTTEngine):
     """
 
     SLUG = "witai"
+    __slots__ = ('_token', '_headers', '_http')
 
     def __init__(self, access_token):
-        self._logger = logging.getLogger(__name__)
+        self._http = _http_session()
         self.token = access_token
 
     @classmethod
@@ -359,14 +547,10 @@ class WitAiSTT(AbstractSTTEngine):
         # FIXME: Replace this as soon as we have a config module
         config = {}
         # Try to get wit.ai Auth token from config
-        profile_path = jasperpath.config('profile.yml')
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r') as f:
-                profile = yaml.safe_load(f)
-                if 'witai-stt' in profile:
-                    if 'access_token' in profile['witai-stt']:
-                        config['access_token'] = \
-                            profile['witai-stt']['access_token']
+        profile = _load_profile()
+        if 'witai-stt' in profile:
+            if 'access_token' in profile['witai-stt']:
+                config['access_token'] = profile['witai-stt']['access_token']
         return config
 
     @property
@@ -385,22 +569,22 @@ class WitAiSTT(AbstractSTTEngine):
         return self._headers
 
     def transcribe(self, fp):
-        data = fp.read()
-        r = requests.post('https://api.wit.ai/speech?v=20150101',
-                          data=data,
-                          headers=self.headers)
+        with self._open_audio(fp) as f:
+            r = self._http.post('https://api.wit.ai/speech?v=20150101',
+                                data=_upload_body(f),
+                                headers=self.headers)
         try:
             r.raise_for_status()
-            text = r.json()['_text']
+            text = _json_loads(r.content)['_text']
         except requests.exceptions.HTTPError:
             self._logger.critical('Request failed with response: %r',
-                                  r.text,
+                                  r.content,
                                   exc_info=True)
             return []
         except requests.exceptions.RequestException:
             self._logger.critical('Request failed.', exc_info=True)
             return []
-        except ValueError as e:
+        except json.JSONDecodeError as e:
             self._logger.critical('Cannot parse response: %s',
                                   e.args[0])
             return []
@@ -432,32 +616,18 @@ def get_engine_by_slug(slug=None):
     if not slug or type(slug) is not str:
         raise TypeError("Invalid slug '%s'", slug)
 
-    selected_engines = list(filter(lambda engine: hasattr(engine, "SLUG") and
-                              engine.SLUG == slug, get_engines()))
-    if len(selected_engines) == 0:
+    engine = AbstractSTTEngine._registry.get(slug)
+    if engine is None:
         raise ValueError("No STT engine found for slug '%s'" % slug)
-    else:
-        if len(selected_engines) > 1:
-            print(("WARNING: Multiple STT engines found for slug '%s'. " +
-                   "This is most certainly a bug.") % slug)
-        engine = selected_engines[0]
-        if not engine.is_available():
-            raise ValueError(("STT engine '%s' is not available (due to " +
-                              "missing dependencies, missing " +
-                              "dependencies, etc.)") % slug)
-        return engine
+    if not engine.is_available():
+        raise ValueError(("STT engine '%s' is not available (due to " +
+                          "missing dependencies, missing " +
+                          "dependencies, etc.)") % slug)
+    return engine
 
 
 def get_engines():
-    def get_subclasses(cls):
-        subclasses = set()
-        for subclass in cls.__subclasses__():
-            subclasses.add(subclass)
-            subclasses.update(get_subclasses(subclass))
-        return subclasses
-    return [tts_engine for tts_engine in
-            list(get_subclasses(AbstractSTTEngine))
-            if hasattr(tts_engine, 'SLUG') and tts_engine.SLUG]
+    return list(AbstractSTTEngine._registry.values())
 
 
 class PocketSphinxSTT(AbstractSTTEngine):
@@ -478,8 +648,6 @@ class PocketSphinxSTT(AbstractSTTEngine):
             hmm_dir -- the path of the Hidden Markov Model (HMM)
         """
 
-        self._logger = logging.getLogger(__name__)
-
         # quirky bug where first import doesn't work
         try:
             import pocketsphinx as ps
@@ -531,15 +699,11 @@ class PocketSphinxSTT(AbstractSTTEngine):
         config = {}
         # HMM dir
         # Try to get hmm_dir from config
-        profile_path = jasperpath.config('profile.yml')
-
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r') as f:
-                profile = yaml.safe_load(f)
-                try:
-                    config['hmm_dir'] = profile['pocketsphinx']['hmm_dir']
-                except KeyError:
-                    pass
+        profile = _load_profile()
+        try:
+            config['hmm_dir'] = profile['pocketsphinx']['hmm_dir']
+        except KeyError:
+            pass
 
         return config
 
@@ -547,14 +711,15 @@ class PocketSphinxSTT(AbstractSTTEngine):
         """
         Performs STT, transcribing an audio file and returning the result.
         Arguments:
-            fp -- a file object containing audio data
+            fp -- a file object or the path of the .wav file to be transcribed
         """
 
-        fp.seek(44)
+        with self._open_audio(fp) as f:
+            f.seek(44)
 
-        # FIXME: Can't use the Decoder.decode_raw() here, because
-        # pocketsphinx segfaults with tempfile.SpooledTemporaryFile()
-        data = fp.read()
+            # FIXME: Can't use the Decoder.decode_raw() here, because
+            # pocketsphinx segfaults with tempfile.SpooledTemporaryFile()
+            data = f.read()
         self._decoder.start_utt()
         self._decoder.process_raw(data, False, True)
         self._decoder.end_utt()
@@ -585,7 +750,6 @@ class JuliusSTT(AbstractSTTEngine):
     def __init__(self, vocabulary=None, hmmdefs="/usr/share/voxforge/julius/" +
                  "acoustic_model_files/hmmdefs", tiedlist="/usr/share/" +
                  "voxforge/julius/acoustic_model_files/tiedlist"):
-        self._logger = logging.getLogger(__name__)
         self._vocabulary = vocabulary
         self._hmmdefs = hmmdefs
         self._tiedlist = tiedlist
@@ -622,16 +786,12 @@ class JuliusSTT(AbstractSTTEngine):
         config = {}
         # HMM dir
         # Try to get hmm_dir from config
-        profile_path = jasperpath.config('profile.yml')
-
-        if os.path.exists(profile_path):
-            with open(profile_path, 'r') as f:
-                profile = yaml.safe_load(f)
-                if 'julius' in profile:
-                    if 'hmmdefs' in profile['julius']:
-                        config['hmmdefs'] = profile['julius']['hmmdefs']
-                    if 'tiedlist' in profile['julius']:
-                        config['tiedlist'] = profile['julius']['tiedlist']
+        profile = _load_profile()
+        if 'julius' in profile:
+            if 'hmmdefs' in profile['julius']:
+                config['hmmdefs'] = profile['julius']['hmmdefs']
+            if 'tiedlist' in profile['julius']:
+                config['tiedlist'] = profile['julius']['tiedlist']
         return config
 
     def transcribe(self, fp, mode=None):
@@ -648,7 +808,9 @@ class JuliusSTT(AbstractSTTEngine):
         self._logger.debug('Executing: %r', cmd)
         with tempfile.SpooledTemporaryFile() as out_f:
             with tempfile.SpooledTemporaryFile() as err_f:
-                subprocess.call(cmd, stdin=fp, stdout=out_f, stderr=err_f)
+                with self._open_audio(fp) as f:
+                    subprocess.call(cmd, stdin=f, stdout=out_f,
+                                    stderr=err_f)
             out_f.seek(0)
             results = [(int(i), text) for i, text in
                        self._pattern.findall(out_f.read())]
@@ -2,6 +2,16 @@
 # -*- coding: utf-8-*-
 import unittest
 import imp
+import io
+import json
+import tempfile
+import wave
+import asyncio
+import time
+import logging
+import pathlib
+import mock
+import requests
 from client import stt, jasperpath
 
 
@@ -23,6 +33,42 @@ def pocketsphinx_installed():
         return True
 
 
+def make_wav(frames, frame_rate=16000):
+    f = io.BytesIO()
+    wav_fp = wave.open(f, 'wb')
+    wav_fp.setnchannels(1)
+    wav_fp.setsampwidth(2)
+    wav_fp.setframerate(frame_rate)
+    wav_fp.writeframes(frames)
+    wav_fp.close()
+    f.seek(0)
+    return f
+
+
+def json_response(payload, status_code=200):
+    return mock.Mock(status_code=status_code,
+                     content=json.dumps(payload).encode('utf-8'),
+                     **{'json.return_value': payload})
+
+
+def prepare_upload(url, data, headers):
+    """
+    Prepares the request like requests would send it and returns its
+    Content-Length and body.
+    """
+    request = requests.Request('POST', url, data=data,
+                               headers=headers).prepare()
+    body = request.body
+    if hasattr(body, 'read'):
+        body = body.read()
+    return int(request.headers['Content-Length']), bytes(body)
+
+
+RECOGNITION = {'Recognition': {'Status': 'OK',
+                               'NBest': [{'Hypothesis': 'time',
+                                          'Confidence': 0.9}]}}
+
+
 @unittest.skipUnless(cmuclmtk_installed(), "CMUCLMTK not present")
 @unittest.skipUnless(pocketsphinx_installed(), "Pocketsphinx not present")
 class TestSTT(unittest.TestCase):
@@ -49,3 +95,214 @@ class TestSTT(unittest.TestCase):
         with open(self.time_clip, mode="rb") as f:
             transcription = self.active_stt_engine.transcribe(f)
         self.assertIn("TIME", transcription)
+
+
+class TestGoogleSTT(unittest.TestCase):
+
+    def testRequestUrl(self):
+        engine = stt.GoogleSTT(api_key='my key', language='en-us')
+        self.assertEqual(engine.request_url,
+                         'https://www.google.com/speech-api/v2/recognize' +
+                         '?output=json&client=chromium&key=my+key' +
+                         '&lang=en-us&maxresults=6&pfilter=2')
+        engine.api_key = None
+        self.assertIsNone(engine.request_url)
+
+    def testTranscribeStreamsSampleData(self):
+        """
+        Is only the sample data after the 44 byte WAV header uploaded?
+        """
+        frames = b'\x01\x02' * 8
+        uploads = []
+
+        def post(url, data, headers):
+            uploads.append((headers['content-type'],) +
+                           prepare_upload(url, data, headers))
+            return mock.Mock(status_code=200,
+                             content=b'{"result":[]}\n{"result":[' +
+                                     b'{"alternative":[' +
+                                     b'{"transcript":"what time is it"}]}]}\n')
+
+        engine = stt.GoogleSTT(api_key='key')
+        engine._http = mock.Mock()
+        engine._http.post.side_effect = post
+        transcribed = engine.transcribe(make_wav(frames, frame_rate=8000))
+
+        self.assertEqual(uploads,
+                         [('audio/l16; rate=8000', len(frames), frames)])
+        self.assertEqual(transcribed, ('WHAT TIME IS IT',))
+
+    def testTranscribeAcceptsPath(self):
+        path = pathlib.Path(jasperpath.data('audio', 'time.wav'))
+        with open(str(path), 'rb') as f:
+            frames = f.read()[44:]
+        files = []
+        uploads = []
+
+        def post(url, data, headers):
+            files.append(data)
+            uploads.append(prepare_upload(url, data, headers))
+            return mock.Mock(status_code=200, content=b'{"result":[]}')
+
+        engine = stt.GoogleSTT(api_key='key')
+        engine._http = mock.Mock()
+        engine._http.post.side_effect = post
+
+        self.assertEqual(engine.transcribe(path), [])
+        self.assertEqual(uploads, [(len(frames), frames)])
+        self.assertTrue(files[0].closed)
+
+
+class TestAttSTT(unittest.TestCase):
+
+    def setUp(self):
+        # Don't fetch a token in the background
+        patcher = mock.patch.object(stt.AttSTT, '_prefetch_token')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = stt.AttSTT('key', 'secret')
+        self.engine._http = mock.Mock()
+
+    def testTranscribeRetriesWithNewToken(self):
+        """
+        Is the whole audio sent again after a 401 response?
+        """
+        audio = make_wav(b'\x01\x02' * 8).read()
+        responses = [json_response({}, status_code=401),
+                     json_response(RECOGNITION)]
+        uploads = []
+
+        def post(url, data, headers, **kwargs):
+            if url.endswith('/token'):
+                return json_response({'access_token': 'fresh'})
+            uploads.append((headers['authorization'],) +
+                           prepare_upload(url, data, headers))
+            return responses.pop(0)
+
+        self.engine._token = 'expired'
+        self.engine._token_expiry = float('inf')
+        self.engine._http.post.side_effect = post
+        with tempfile.TemporaryFile() as fp:
+            fp.write(b'junk' + audio)
+            fp.seek(4)
+            transcribed = self.engine.transcribe(fp)
+
+        self.assertEqual(uploads, [('Bearer expired', len(audio), audio),
+                                   ('Bearer fresh', len(audio), audio)])
+        self.assertEqual(transcribed, ['TIME'])
+
+    def testConcurrentTranscriptionsShareToken(self):
+        """
+        Do concurrent transcriptions share a single token request?
+        """
+        token_requests = []
+
+        def post(url, data, headers, **kwargs):
+            if url.endswith('/token'):
+                token_requests.append(url)
+                # Give the other transcription time to wait for the token
+                time.sleep(0.05)
+                return json_response({'access_token': 'token'})
+            return json_response(RECOGNITION)
+
+        self.engine._http.post.side_effect = post
+
+        async def transcribe_both():
+            return await asyncio.gather(
+                self.engine.transcribe_async(make_wav(b'\x01\x02')),
+                self.engine.transcribe_async(make_wav(b'\x03\x04')))
+
+        self.assertEqual(asyncio.run(transcribe_both()), [['TIME'], ['TIME']])
+        self.assertEqual(len(token_requests), 1)
+
+    def testTokenIsRefreshedBeforeExpiry(self):
+        """
+        Is the token reused until a minute before it expires?
+        """
+        self.engine._http.post.side_effect = [
+            json_response({'access_token': 'first', 'expires_in': 3600}),
+            json_response({'access_token': 'second', 'expires_in': 3600})]
+        with mock.patch('time.monotonic', return_value=1000):
+            self.assertEqual(self.engine.token, 'first')
+        with mock.patch('time.monotonic', return_value=1000 + 3539):
+            self.assertEqual(self.engine.token, 'first')
+        self.assertEqual(self.engine._http.post.call_count, 1)
+        with mock.patch('time.monotonic', return_value=1000 + 3540):
+            self.assertEqual(self.engine.token, 'second')
+        self.assertEqual(self.engine._http.post.call_count, 2)
+        self.assertIn('timeout', self.engine._http.post.call_args[1])
+
+    def testTokenWithoutExpiry(self):
+        """
+        Is a token without expires_in kept until it is rejected?
+        """
+        self.engine._http.post.return_value = json_response(
+            {'access_token': 'forever'})
+        with mock.patch('time.monotonic', return_value=1000):
+            self.assertEqual(self.engine.token, 'forever')
+        with mock.patch('time.monotonic', return_value=10 ** 9):
+            self.assertEqual(self.engine.token, 'forever')
+        self.assertEqual(self.engine._http.post.call_count, 1)
+
+
+class TestWitAiSTT(unittest.TestCase):
+
+    def testTranscribeKeepsSpooledAudioInMemory(self):
+        """
+        Is audio from a SpooledTemporaryFile uploaded without rolling it
+        over to disk?
+        """
+        audio = make_wav(b'\x01\x02' * 8).read()
+        uploads = []
+
+        def post(url, data, headers):
+            uploads.append(prepare_upload(url, data, headers))
+            return json_response({'_text': 'what time is it'})
+
+        engine = stt.WitAiSTT('token')
+        engine._http = mock.Mock()
+        engine._http.post.side_effect = post
+        with tempfile.SpooledTemporaryFile(mode='w+b') as f:
+            f.write(audio)
+            f.seek(0)
+            transcribed = engine.transcribe(f)
+            self.assertFalse(f._rolled)
+
+        self.assertEqual(uploads, [(len(audio), audio)])
+        self.assertEqual(transcribed, ['WHAT TIME IS IT'])
+
+
+class TestEngineLookup(unittest.TestCase):
+
+    def testGetEngines(self):
+        engines = stt.get_engines()
+        for engine in (stt.GoogleSTT, stt.AttSTT, stt.WitAiSTT,
+                       stt.PocketSphinxSTT, stt.JuliusSTT):
+            self.assertIn(engine, engines)
+
+    def testDuplicateSlugKeepsFirstEngine(self):
+        self.addCleanup(stt.AbstractSTTEngine._registry.pop, 'duplicate')
+        first = type('FirstSTT', (stt.AbstractSTTEngine,),
+                     {'SLUG': 'duplicate'})
+        logger = logging.getLogger(stt.__name__)
+        with mock.patch.object(logger, 'warning') as mocked_warning:
+            type('SecondSTT', (stt.AbstractSTTEngine,),
+                 {'SLUG': 'duplicate'})
+        self.assertTrue(mocked_warning.called)
+        self.assertIs(stt.AbstractSTTEngine._registry['duplicate'], first)
+
+    def testGetEngineByUnknownSlug(self):
+        with self.assertRaises(ValueError):
+            stt.get_engine_by_slug('no-such-engine')
+
+
+class TestParseLastJsonObject(unittest.TestCase):
+
+    def testMultipleObjects(self):
+        content = b'{"result":[]}\n{"result":[{"final":true}]}\n'
+        self.assertEqual(stt._parse_last_json_object(content),
+                         {'result': [{'final': True}]})
+
+    def testSingleObject(self):
+        self.assertEqual(stt._parse_last_json_object(b'{"result":[]}'),
+                         {'result': []})